@@ -66,6 +66,33 @@ def register_tools(mcp: FastMCP, controller: SearchController):
         """
         return controller.get_document(docid, index_name)
     
+    @mcp.tool(
+        name="update_index_settings",
+        description="Update the settings of a loaded index, e.g., switch an HNSW index between fp32 and int8 quantization.",
+    )
+    def update_index_settings(
+        index_name: str,
+        ef_search: Optional[int] = None,
+        encoder: Optional[str] = None,
+        query_generator: Optional[str] = None,
+        quantization: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """
+        Update the settings of a loaded index.
+
+        Args:
+            index_name: Name of the index to update
+            ef_search: EF search parameter
+            encoder: Encoder to use
+            query_generator: Query generator to use
+            quantization: Vector quantization for HNSW indexes, "fp32" or "int8"
+
+        Returns:
+            Current settings of the index.
+        """
+        controller.update_settings(index_name, ef_search, encoder, query_generator, quantization)
+        return controller.get_settings(index_name)
+
     @mcp.tool(
         name="list_all_indexes",
         description="List all available indexes in the Pyserini server.",
@@ -21,9 +21,13 @@ Models and configuration classes for Pyserini FastAPI and MCP server.
 """
 
 from dataclasses import dataclass
+from typing import Literal
 
 from pyserini.search.lucene import LuceneSearcher, LuceneHnswDenseSearcher
 
+QUANTIZATIONS = ("fp32", "int8")
+DEFAULT_QUANTIZATION = "int8"
+
 
 @dataclass
 class IndexConfig:
@@ -33,3 +37,6 @@ class IndexConfig:
     ef_search: int | None = None
     encoder: str | None = None
     query_generator: str | None = None
+    quantization: Literal["fp32", "int8"] = DEFAULT_QUANTIZATION
+    # Prebuilt index actually loaded, e.g., the int8 variant of an HNSW index
+    prebuilt_index: str | None = None
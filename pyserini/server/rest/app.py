@@ -8,6 +8,7 @@ Usage:
 
 Example:
     python -m pyserini.server.rest --port 8080
+    python -m pyserini.server.rest --warm-shards
 
 Endpoints:
     GET /                 : API metadata and documentation link.
@@ -18,6 +19,7 @@ Endpoints:
 
 from fastapi import FastAPI
 from pyserini.server.rest.routes.indexes import router
+from pyserini.server.search_controller import get_controller
 
 
 name = "Pyserini API"
@@ -53,6 +55,16 @@ def main():
         default=8081,
         help="Port to run the server on (default: 8081)",
     )
+    parser.add_argument(
+        "--warm-shards",
+        action="store_true",
+        help="Initialize all msmarco-v2.1 shard indexes at startup instead of on the first sharded search",
+    )
     args = parser.parse_args()
 
+    # Load the default index before accepting requests
+    controller = get_controller()
+    if args.warm_shards:
+        controller.initialize_sharded_indexes()
+
     uvicorn.run(app, host="0.0.0.0", port=args.port)
@@ -21,14 +21,14 @@ Index-related API endpoints for the Pyserini server.
 Provides routes for searching indexes, retrieving documents, checking index status, listing indexes, and updating or fetching index settings.
 """
 
-from fastapi import APIRouter, Query, Path, HTTPException
-from typing import Optional, Any
+from fastapi import APIRouter, Query, Path, HTTPException, Response
+from typing import Optional, Any, Literal
 from pyserini.server.search_controller import get_controller
 
 router = APIRouter(prefix="/indexes", tags=["indexes"])
 
 
-@router.get("/{index}/search")
+@router.get("/{index}/search", response_model=dict[str, Any])
 async def search_index(
     index: str = Path(..., description="Index name"),
     query: str = Query(..., description="Search query"),
@@ -37,28 +37,30 @@ async def search_index(
     ef_search: int | None = Query(None, description="EF search parameter"),
     encoder: str | None = Query(None, description="Encoder to use"),
     query_generator: str | None = Query(None, description="Query generator to use"),
-) -> dict[str, Any]:
+) -> Response:
     try:
-        return get_controller().search(
+        body = get_controller().search_bytes(
             query, index, hits, qid, ef_search, encoder, query_generator
         )
+        return Response(content=body, media_type="application/json")
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/sharded/msmarco-v2.1-doc-artic-embed-l/search")
+@router.get("/sharded/msmarco-v2.1-doc-artic-embed-l/search", response_model=list[dict[str, Any]])
 async def sharded_search(
     query: str = Query(..., description="Search query"),
     hits: int = Query(default=10, description="Number of hits to return"),
     ef_search: int | None = Query(default=100, description="EF search parameter"),
     encoder: str | None = Query(default="ArcticEmbedL", description="Encoder to use"),
-) -> list[dict[str, Any]]:
+) -> Response:
     try:
-        return get_controller().sharded_search(
+        body = get_controller().sharded_search_bytes(
             query, hits, ef_search, encoder
         )
+        return Response(content=body, media_type="application/json")
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
     except Exception as e:
@@ -99,9 +101,10 @@ async def update_index_settings(
     ef_search: Optional[int] = Query(None, description="EF search parameter"),
     encoder: Optional[str] = Query(None, description="Encoder to use"),
     query_generator: Optional[str] = Query(None, description="Query generator to use"),
+    quantization: Optional[Literal["fp32", "int8"]] = Query(None, description="Vector quantization for HNSW indexes"),
 ) -> dict[str, Any]:
     try:
-        return get_controller().update_settings(index, ef_search, encoder, query_generator)
+        return get_controller().update_settings(index, ef_search, encoder, query_generator, quantization)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -21,58 +21,361 @@ Search controller for Pyserini capabilities.
 Initialized with prebuilt index msmarco-v1-passage.
 """
         
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import json
-from typing import Any
+import atexit
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import threading
+import time
+from typing import Any, Hashable
+
+import numpy as np
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 
 from pyserini.search.lucene import LuceneSearcher, LuceneHnswDenseSearcher
 from pyserini.prebuilt_index_info import TF_INDEX_INFO, LUCENE_HNSW_INDEX_INFO
 from pyserini.util import check_downloaded
 
-from pyserini.server.models import IndexConfig
+from pyserini.server.models import DEFAULT_QUANTIZATION, QUANTIZATIONS, IndexConfig
+
+from jnius import detach
 
 DEFAULT_INDEX = "msmarco-v1-passage"
 
-SHARDS = [
+# Shards are searched and merged in this order, so tied hits come back in the same order on every start
+SHARDS = tuple(
     f"msmarco-v2.1-doc-segmented-shard0{i}.arctic-embed-l.hnsw-int8"
     for i in range(10)
-]
+)
+SHARD_SET = frozenset(SHARDS)
+SHARDED_INDEX = "msmarco-v2.1-doc-artic-embed-l"
+DEFAULT_EF_SEARCH = 100
+DEFAULT_SHARD_ENCODER = "ArcticEmbedL"
+
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 60.0
+
+BATCH_WINDOW = 0.002
+MAX_BATCH_SIZE = 64
+# Split the cores across shards so that concurrent shard batch searches do not oversubscribe the machine
+BATCH_THREADS = os.cpu_count() or 1
+BATCH_THREADS_PER_SHARD = max(1, BATCH_THREADS // len(SHARDS))
+
+
+def _extract_contents(raw: str) -> str:
+    """Return only the ``contents`` field of a stored raw JSON document."""
+    return _loads(raw)["contents"]
+
+
+def _build_candidates(hits) -> list[dict[str, Any]]:
+    """Convert searcher hits into candidate dicts with docid, score, and contents.
+
+    Dense HNSW indexes usually do not store the raw document, so their candidates carry only docid and score.
+    """
+    candidates = []
+    for hit in hits:
+        candidate = {"docid": hit.docid, "score": hit.score}
+        document = getattr(hit, "lucene_document", None)
+        raw = document.get("raw") if document is not None else None
+        if raw is not None:
+            candidate["doc"] = {"contents": _extract_contents(raw)}
+        candidates.append(candidate)
+    return candidates
+
+
+def _resolve_hnsw_index(index_name: str, quantization: str) -> str:
+    """Return the prebuilt HNSW index to load, preferring the int8 quantized variant when requested and available."""
+    if quantization == "int8" and index_name.endswith(".hnsw") and f"{index_name}-int8" in LUCENE_HNSW_INDEX_INFO:
+        return f"{index_name}-int8"
+    return index_name
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the ``k`` highest scores, ordered by score (descending).
+
+    Ties are broken by position, matching a stable sort of all scores.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    # Find the k-th highest score in linear time, then keep the earliest hits tied with it
+    kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    top = np.concatenate([above, ties])
+    # Sort only the selected hits, by score (descending) and then position
+    return top[np.lexsort((top, -scores[top]))]
+
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries expire ``ttl`` seconds after insertion.
+
+    Keys are tuples whose first element is the index name, so that all entries
+    for an index can be invalidated at once. Cached values are handed out to every
+    caller as-is, so they must not be mutated.
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[Hashable, ...]) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: tuple[Hashable, ...], value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, index_name: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == index_name]:
+                del self._entries[key]
+
+
+class QueryBatcherClosed(RuntimeError):
+    """Raised when searching through a batcher whose searcher has been replaced."""
+
+
+class QueryBatcher:
+    """Coalesces concurrent queries to a dense searcher into ``batch_search`` calls.
+
+    A query runs right away when no other search on the searcher is in flight. Queries that arrive while one is in
+    flight are queued, and a single long-lived flusher thread runs them as one batch as soon as nothing is in flight,
+    ``max_batch_size`` queries are pending, or the oldest pending query has waited ``window`` seconds.
+    """
+
+    def __init__(
+        self,
+        searcher: LuceneHnswDenseSearcher,
+        threads: int = 1,
+        window: float = BATCH_WINDOW,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ):
+        self.searcher = searcher
+        self.threads = threads
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: list[tuple[str, int, Future]] = []
+        self._pending_since = 0.0
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._flusher = threading.Thread(target=self._flush_loop, name="query-batcher", daemon=True)
+        self._flusher.start()
+
+    def search(self, query: str, k: int) -> list:
+        """Search, joining the next batch if another search is in flight; blocks until results are available."""
+        with self._cond:
+            if self._closed:
+                raise QueryBatcherClosed("Searcher has been replaced")
+            run_now = self._in_flight == 0 and not self._pending
+            if run_now:
+                self._in_flight += 1
+            else:
+                future: Future = Future()
+                if not self._pending:
+                    self._pending_since = time.monotonic()
+                self._pending.append((query, k, future))
+                self._cond.notify_all()
+
+        if run_now:
+            try:
+                return self.searcher.search(query, k)
+            finally:
+                self._finish()
+        return future.result()
+
+    def close(self) -> None:
+        """Stop accepting queries, run any pending ones, and wait until no search on the searcher is in flight."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        with self._cond:
+            while self._in_flight > 0:
+                self._cond.wait()
+
+    def _finish(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _flush_loop(self) -> None:
+        try:
+            while True:
+                with self._cond:
+                    while not self._pending and not self._closed:
+                        self._cond.wait()
+                    if not self._pending:
+                        return
+
+                    deadline = self._pending_since + self.window
+                    while not self._closed and self._in_flight > 0 and len(self._pending) < self.max_batch_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+
+                    batch = self._pending[:self.max_batch_size]
+                    self._pending = self._pending[self.max_batch_size:]
+                    self._pending_since = time.monotonic()
+                    self._in_flight += 1
+                try:
+                    self._run(batch)
+                finally:
+                    self._finish()
+        finally:
+            # The flusher thread is attached to the JVM by its first search
+            detach()
+
+    def _run(self, batch: list[tuple[str, int, Future]]) -> None:
+        try:
+            if len(batch) == 1:
+                query, k, future = batch[0]
+                future.set_result(self.searcher.search(query, k))
+                return
+
+            qids = [str(i) for i in range(len(batch))]
+            k_max = max(k for _, k, _ in batch)
+            threads = min(len(batch), self.threads)
+            results = self.searcher.batch_search([query for query, _, _ in batch], qids, k_max, threads)
+            for qid, (_, k, future) in zip(qids, batch):
+                future.set_result(results[qid][:k])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
 
 class SearchController:
     """Core functionality controller."""
 
     def __init__(self):
         self.indexes: dict[str, IndexConfig] = {}
+        self._shard_executor = ThreadPoolExecutor(max_workers=len(SHARDS), thread_name_prefix="shard")
+        atexit.register(self._shard_executor.shutdown)
+        self._result_cache = ResultCache()
+        self._index_locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._batchers: dict[str, QueryBatcher] = {}
+        self._all_indexes: dict[str, Any] = {**TF_INDEX_INFO, **LUCENE_HNSW_INDEX_INFO}
 
     def initialize_default_index(self, default_index: str = DEFAULT_INDEX) -> None:
         """Initialize default prebuilt index."""
         
-        if default_index in TF_INDEX_INFO.keys():
+        if default_index in TF_INDEX_INFO:
             self.add_index(
                 IndexConfig(name=default_index)
             )
         else:
             raise ValueError(f"Default index '{default_index}' not found in prebuilt indexes.")
 
+    def initialize_sharded_indexes(
+        self,
+        ef_search: int = DEFAULT_EF_SEARCH,
+        encoder: str = DEFAULT_SHARD_ENCODER,
+    ) -> None:
+        """Initialize all shard searchers concurrently, so that sharded search never builds them lazily."""
+        futures = [
+            self._shard_executor.submit(
+                self.add_index,
+                IndexConfig(name=shard_name, ef_search=ef_search, encoder=encoder),
+            )
+            for shard_name in SHARDS
+        ]
+        for future in futures:
+            future.result()
+
     def add_index(self, config: IndexConfig) -> IndexConfig:
-        """Add a new index to the manager."""
+        """Add a new index to the manager, unless it is already initialized."""
         
-        if config.name in SHARDS:
-            config.searcher = LuceneHnswDenseSearcher.from_prebuilt_index(config.name, ef_search=config.ef_search, encoder=config.encoder, verbose=True)
-        elif config.name in TF_INDEX_INFO.keys():   
-            config.searcher = LuceneSearcher.from_prebuilt_index(config.name)         
-        else:
+        if config.name not in LUCENE_HNSW_INDEX_INFO and config.name not in TF_INDEX_INFO:
             raise ValueError(f"Index '{config.name}' not currently supported in prebuilt indexes.")
 
-        self.indexes[config.name] = config
-        return config
+        existing = self.indexes.get(config.name)
+        if existing and existing.searcher:
+            return existing
+
+        with self._index_lock(config.name):
+            # Another thread may have built the searcher while we waited for the lock
+            existing = self.indexes.get(config.name)
+            if existing and existing.searcher:
+                return existing
+
+            if config.name in LUCENE_HNSW_INDEX_INFO:
+                if config.ef_search is None:
+                    config.ef_search = DEFAULT_EF_SEARCH
+                self._load_hnsw_searcher(config)
+            else:
+                config.prebuilt_index = config.name
+                config.searcher = LuceneSearcher.from_prebuilt_index(config.name)
+
+            self.indexes[config.name] = config
+            return config
+
+    def _load_hnsw_searcher(self, config: IndexConfig) -> None:
+        """Load the HNSW searcher for the quantization set on the config; the caller holds the index lock."""
+        if config.quantization not in QUANTIZATIONS:
+            raise ValueError(f"Quantization '{config.quantization}' not supported, expected one of {QUANTIZATIONS}.")
+        config.prebuilt_index = _resolve_hnsw_index(config.name, config.quantization)
+        config.searcher = LuceneHnswDenseSearcher.from_prebuilt_index(config.prebuilt_index, ef_search=config.ef_search, encoder=config.encoder, verbose=True)
+        threads = BATCH_THREADS_PER_SHARD if config.name in SHARD_SET else BATCH_THREADS
+        batcher = QueryBatcher(config.searcher, threads=threads) if config.searcher else None
+        previous = self._batchers.pop(config.name, None)
+        if batcher is not None:
+            self._batchers[config.name] = batcher
+        if previous is not None:
+            # Once the old batcher has drained, nothing searches the old searcher and its reader can be released
+            previous.close()
+            previous.searcher.close()
+
+    def _search_hits(self, index_config: IndexConfig, query: str, k: int) -> list:
+        """Search an index, batching concurrent queries to dense indexes."""
+        while True:
+            batcher = self._batchers.get(index_config.name)
+            if batcher is None:
+                return index_config.searcher.search(query, k)
+            try:
+                return batcher.search(query, k)
+            except QueryBatcherClosed:
+                # The searcher was reloaded after the batcher was looked up; retry with the new one
+                continue
+
+    def _index_lock(self, index_name: str) -> threading.Lock:
+        """Get the lock guarding searcher construction for an index."""
+        with self._locks_lock:
+            lock = self._index_locks.get(index_name)
+            if lock is None:
+                lock = self._index_locks[index_name] = threading.Lock()
+            return lock
 
     def get_indexes(self) -> dict[str, Any]:
         """Get all indexes (only prebuilt for now)"""
-        indexes: dict[str, Any] = {}
-        indexes.update(TF_INDEX_INFO)
-        indexes.update(LUCENE_HNSW_INDEX_INFO)
-        return indexes
+        return self._all_indexes
 
     def search(
         self,
@@ -84,38 +387,65 @@ class SearchController:
         encoder: str | None = None,
         query_generator: str | None = None,
     ) -> dict[str, Any]:
-        """Perform search on specified index."""
-        hits = []
-        
+        """Perform search on specified index.
+
+        The candidate list may be shared with other callers through the result cache and must not be mutated.
+        """
+        cache_key = (index_name, query, k, ef_search, encoder, query_generator)
+        candidates = self._result_cache.get(cache_key)
+        if candidates is None:
+            candidates = self._search_candidates(query, index_name, k, ef_search, encoder, query_generator)
+            self._result_cache.put(cache_key, candidates)
+
+        return {"query": {"qid": qid, "text": query}, "candidates": candidates}
+
+    def _search_candidates(
+        self,
+        query: str,
+        index_name: str,
+        k: int,
+        ef_search: int | None,
+        encoder: str | None,
+        query_generator: str | None,
+    ) -> list[dict[str, Any]]:
+        """Search an index without going through the result cache."""
         index_config = self.indexes.get(index_name)
-        if not index_config or not index_config.searcher:
+        if index_config is None or index_config.searcher is None:
             index_config = self.add_index(
                 IndexConfig(
                     name=index_name,
-                    path=index_name,
                     ef_search=ef_search,
                     encoder=encoder,
                     query_generator=query_generator
                 )
             )
             
-        hits = index_config.searcher.search(query, k)
-        results: dict[str, Any] = {"query": {"qid": qid, "text": query}}
-        candidates: list[dict[str, Any]] = []
-
-        for hit in hits:
-            raw = json.loads(hit.lucene_document.get("raw"))
-            candidates.append(
-                {
-                    "docid": hit.docid,
-                    "score": hit.score,
-                    "doc": {"contents": raw["contents"]},
-                }
-            )
-        results["candidates"] = candidates
-
-        return results
+        return _build_candidates(self._search_hits(index_config, query, k))
     
+    def search_bytes(
+        self,
+        query: str,
+        index_name: str,
+        k: int = 10,
+        qid: str = "",
+        ef_search: int | None = None,
+        encoder: str | None = None,
+        query_generator: str | None = None,
+    ) -> bytes:
+        """Perform search on specified index, returning the results serialized as JSON.
+
+        Only the serialized bytes are cached, so each query takes a single cache slot.
+        """
+        cache_key = (index_name, "json", query, k, qid, ef_search, encoder, query_generator)
+        body = self._result_cache.get(cache_key)
+        if body is None:
+            candidates = self._result_cache.get((index_name, query, k, ef_search, encoder, query_generator))
+            if candidates is None:
+                candidates = self._search_candidates(query, index_name, k, ef_search, encoder, query_generator)
+            body = _dumps({"query": {"qid": qid, "text": query}, "candidates": candidates})
+            self._result_cache.put(cache_key, body)
+        return body
+
     # TODO: make this not default to sharded search for msmarco-v2.1-doc-artic-embed-l
     def sharded_search( 
         self,
@@ -124,37 +454,70 @@ class SearchController:
         ef_search: int,
         encoder: str,
     ) -> list[dict[str, float]]:   
-                
-        executor = ThreadPoolExecutor(max_workers=len(SHARDS))
-
-        future_to_shard = {}
-        for shard_name in SHARDS:
-            future = executor.submit(
-                self._search_single_shard, 
-                shard_name, 
-                query, 
-                k, 
-                ef_search, 
-                encoder
-            )
-            future_to_shard[future] = shard_name
-        
-        all_results = []
-        for future in as_completed(future_to_shard):
-            shard_name = future_to_shard[future]
-            shard_results = future.result()
-            all_results.extend(shard_results)
+        """Search all msmarco-v2.1 shards and merge the top k hits.
+
+        The returned list may be shared with other callers through the result cache and must not be mutated.
+        """
+        cache_key = (SHARDED_INDEX, query, k, ef_search, encoder)
+        top_results = self._result_cache.get(cache_key)
+        if top_results is None:
+            top_results = self._sharded_search(query, k, ef_search, encoder)
+            self._result_cache.put(cache_key, top_results)
+        return top_results
+
+    def _sharded_search(
+        self,
+        query: str,
+        k: int,
+        ef_search: int,
+        encoder: str,
+    ) -> list[dict[str, float]]:
+        """Search all shards and merge the top k hits without going through the result cache."""
+        shard_results = self._shard_executor.map(
+            lambda shard_name: self._search_single_shard(shard_name, query, k, ef_search, encoder),
+            SHARDS,
+        )
+
+        all_scores: list[np.ndarray] = []
+        all_docids: list[str] = []
+        for scores, docids in shard_results:
+            all_scores.append(scores)
+            all_docids.extend(docids)
         
-        # Sort all results by score (descending) and take top k
-        all_results.sort(key=lambda x: x["score"], reverse=True)
-        return all_results[:k]
+        scores = np.concatenate(all_scores)
+        top = _top_k_indices(scores, k)
+        return [{"docid": all_docids[i], "score": float(scores[i])} for i in top]
+
+    def sharded_search_bytes(
+        self,
+        query: str,
+        k: int,
+        ef_search: int,
+        encoder: str,
+    ) -> bytes:
+        """Perform sharded search, returning the results serialized as JSON.
+
+        Only the serialized bytes are cached, so each query takes a single cache slot.
+        """
+        cache_key = (SHARDED_INDEX, "json", query, k, ef_search, encoder)
+        body = self._result_cache.get(cache_key)
+        if body is None:
+            top_results = self._result_cache.get((SHARDED_INDEX, query, k, ef_search, encoder))
+            if top_results is None:
+                top_results = self._sharded_search(query, k, ef_search, encoder)
+            body = _dumps(top_results)
+            self._result_cache.put(cache_key, body)
+        return body
            
     def get_document(self, docid: str, index_name: str) -> dict[str, Any]:
         """Retrieve full document by document ID."""
-        index_config = self.indexes[index_name]
+        # Dense (HNSW) searchers cannot fetch documents by docid
+        if index_name not in TF_INDEX_INFO:
+            raise ValueError(f"Document retrieval not supported for index '{index_name}'")
 
-        if not index_config.searcher:       
-            index_config.searcher = LuceneSearcher.from_prebuilt_index(index_config.name)
+        index_config = self.indexes.get(index_name)
+        if index_config is None or index_config.searcher is None:
+            index_config = self.add_index(IndexConfig(name=index_name))
 
         doc = index_config.searcher.doc(docid)
         if doc is None:
@@ -162,13 +525,22 @@ class SearchController:
 
         return {
             "docid": docid,
-            "text": json.loads(doc.raw())["contents"],
+            "text": _extract_contents(doc.raw()),
         }
 
     def get_status(self, index_name: str) -> dict[str, Any]:
+        # Report on the prebuilt index that is (or would be) loaded, e.g., the int8 variant of an HNSW index
+        index_config = self.indexes.get(index_name)
+        if index_config is not None and index_config.prebuilt_index is not None:
+            prebuilt_index = index_config.prebuilt_index
+        elif index_name in LUCENE_HNSW_INDEX_INFO:
+            prebuilt_index = _resolve_hnsw_index(index_name, DEFAULT_QUANTIZATION)
+        else:
+            prebuilt_index = index_name
+
         status = {}
-        status["downloaded"] = check_downloaded(index_name)
-        status["size compressed (bytes)"] = TF_INDEX_INFO[index_name]["size compressed (bytes)"] if TF_INDEX_INFO.get(index_name) else "Not available"
+        status["downloaded"] = check_downloaded(prebuilt_index)
+        status["size compressed (bytes)"] = self._all_indexes[prebuilt_index]["size compressed (bytes)"] if self._all_indexes.get(prebuilt_index) else "Not available"
         return status
 
     def update_settings(
@@ -177,11 +549,19 @@ class SearchController:
         ef_search: str | None = None,
         encoder: str | None = None,
         query_generator: str | None = None,
+        quantization: str | None = None,
     ) -> None:
-        """Update index settings."""
+        """Update index settings; changing the quantization of an HNSW index reloads its searcher."""
         index_config = self.indexes[index_name]
         if not index_config:
             raise ValueError(f"Index '{index_name}' not available")
+        # Validate before changing anything, so a rejected update leaves the index as it was
+        reload = quantization is not None and quantization != index_config.quantization
+        if reload:
+            if index_name not in LUCENE_HNSW_INDEX_INFO:
+                raise ValueError(f"Quantization not supported for index '{index_name}'")
+            if quantization not in QUANTIZATIONS:
+                raise ValueError(f"Quantization '{quantization}' not supported, expected one of {QUANTIZATIONS}.")
 
         if ef_search is not None:
             index_config.ef_search = int(ef_search)
@@ -189,6 +569,15 @@ class SearchController:
             index_config.encoder = encoder
         if query_generator is not None:
             index_config.query_generator = query_generator
+        if reload:
+            with self._index_lock(index_name):
+                index_config.quantization = quantization
+                if _resolve_hnsw_index(index_name, quantization) != index_config.prebuilt_index:
+                    self._load_hnsw_searcher(index_config)
+
+        self._result_cache.invalidate(index_name)
+        if index_name in SHARD_SET:
+            self._result_cache.invalidate(SHARDED_INDEX)
 
     def get_settings(self, index_name: str) -> dict[str, Any]:
         """Get current index settings."""
@@ -203,6 +592,9 @@ class SearchController:
             settings["encoder"] = index_config.encoder
         if index_config.query_generator is not None:
             settings["queryGenerator"] = index_config.query_generator
+        if index_config.name in LUCENE_HNSW_INDEX_INFO and index_config.prebuilt_index is not None:
+            # Report what was actually loaded; not every HNSW index has an int8 variant
+            settings["quantization"] = "int8" if index_config.prebuilt_index.endswith("-int8") else "fp32"
         return settings
     
     def _search_single_shard(
@@ -212,10 +604,10 @@ class SearchController:
         k: int,
         ef_search: int,
         encoder: str,
-    ) -> list[dict[str, float]]:
-        """Search a single shard."""
+    ) -> tuple[np.ndarray, list[str]]:
+        """Search a single shard, returning parallel arrays of scores and docids."""
         index_config = self.indexes.get(shard_name)
-        if not index_config or not index_config.searcher:
+        if index_config is None or index_config.searcher is None:
             index_config = self.add_index(
                 IndexConfig(
                     name=shard_name,
@@ -224,20 +616,21 @@ class SearchController:
                 )
             )
             
-        hits = index_config.searcher.search(query, k)
-        results = []
-
-        for hit in hits:
-            results.append({
-                "docid": hit.docid,
-                "score": hit.score,
-            })
-            
-        return results
+        hits = self._search_hits(index_config, query, k)
+        scores = np.array([hit.score for hit in hits], dtype=np.float32)
+        docids = [hit.docid for hit in hits]
+        return scores, docids
+
+_controller: SearchController | None = None
+_controller_lock = threading.Lock()
 
-controller = SearchController()
-controller.initialize_default_index()
 
 def get_controller() -> SearchController:
-    """Get the singleton instance of SearchController."""
-    return controller
+    """Get the singleton instance of SearchController, initializing the default index on first use."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            controller = SearchController()
+            controller.initialize_default_index()
+            _controller = controller
+        return _controller
@@ -0,0 +1,383 @@
+#
+# Pyserini: Reproducible IR research with sparse and dense representations
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from pyserini.server.models import IndexConfig
+from pyserini.server.search_controller import (
+    SHARDED_INDEX, SHARDS, QueryBatcher, QueryBatcherClosed, ResultCache, SearchController, _top_k_indices
+)
+
+
+class TestResultCache(unittest.TestCase):
+    def test_ttl_expiry(self):
+        cache = ResultCache(maxsize=10, ttl=60.0)
+        with mock.patch('pyserini.server.search_controller.time.monotonic', return_value=1000.0):
+            cache.put(('index', 'query'), 'value')
+        with mock.patch('pyserini.server.search_controller.time.monotonic', return_value=1059.0):
+            self.assertEqual(cache.get(('index', 'query')), 'value')
+        with mock.patch('pyserini.server.search_controller.time.monotonic', return_value=1061.0):
+            self.assertIsNone(cache.get(('index', 'query')))
+        # The expired entry is dropped, not just hidden.
+        self.assertEqual(len(cache._entries), 0)
+
+    def test_lru_eviction(self):
+        cache = ResultCache(maxsize=2, ttl=60.0)
+        cache.put(('index', 'a'), 'a')
+        cache.put(('index', 'b'), 'b')
+        # Reading 'a' makes 'b' the least recently used entry.
+        self.assertEqual(cache.get(('index', 'a')), 'a')
+        cache.put(('index', 'c'), 'c')
+        self.assertIsNone(cache.get(('index', 'b')))
+        self.assertEqual(cache.get(('index', 'a')), 'a')
+        self.assertEqual(cache.get(('index', 'c')), 'c')
+
+    def test_invalidate(self):
+        cache = ResultCache(maxsize=10, ttl=60.0)
+        cache.put(('index1', 'query', 10), ['candidates'])
+        cache.put(('index1', 'json', 'query', 10), b'[]')
+        cache.put(('index2', 'query', 10), ['candidates'])
+        cache.invalidate('index1')
+        self.assertIsNone(cache.get(('index1', 'query', 10)))
+        self.assertIsNone(cache.get(('index1', 'json', 'query', 10)))
+        self.assertEqual(cache.get(('index2', 'query', 10)), ['candidates'])
+
+
+class TestTopKIndices(unittest.TestCase):
+    @staticmethod
+    def sort_merge(scores, k):
+        # Reference: the full stable sort sharded_search used before the vectorized merge.
+        return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:max(k, 0)]
+
+    def test_order(self):
+        scores = np.array([0.5, 2.0, 1.0, 3.0, 1.5], dtype=np.float32)
+        self.assertEqual(_top_k_indices(scores, 3).tolist(), [3, 1, 4])
+
+    def test_ties(self):
+        scores = np.array([1.0, 2.0, 1.0, 2.0, 1.0, 0.5], dtype=np.float32)
+        self.assertEqual(_top_k_indices(scores, 3).tolist(), [1, 3, 0])
+        self.assertEqual(_top_k_indices(scores, 4).tolist(), [1, 3, 0, 2])
+
+    def test_k_larger_than_hits(self):
+        scores = np.array([1.0, 3.0, 2.0], dtype=np.float32)
+        self.assertEqual(_top_k_indices(scores, 10).tolist(), [1, 2, 0])
+        self.assertEqual(_top_k_indices(np.empty(0, dtype=np.float32), 10).tolist(), [])
+
+    def test_k_not_positive(self):
+        scores = np.array([1.0, 3.0, 2.0], dtype=np.float32)
+        self.assertEqual(_top_k_indices(scores, 0).tolist(), [])
+        self.assertEqual(_top_k_indices(scores, -1).tolist(), [])
+
+    def test_matches_sort_merge(self):
+        rng = np.random.default_rng(42)
+        for _ in range(100):
+            # Few distinct values, so that most selections cut through a run of ties.
+            scores = rng.integers(0, 5, size=rng.integers(0, 50)).astype(np.float32)
+            k = int(rng.integers(-1, 60))
+            self.assertEqual(_top_k_indices(scores, k).tolist(), self.sort_merge(scores.tolist(), k))
+
+
+class TestSearchControllerCache(unittest.TestCase):
+    def setUp(self):
+        self.controller = SearchController()
+
+    def test_update_settings_invalidates_sharded_results(self):
+        shard = SHARDS[0]
+        self.controller.indexes[shard] = IndexConfig(name=shard)
+        cache = self.controller._result_cache
+        cache.put((SHARDED_INDEX, 'query', 10, 100, 'ArcticEmbedL'), [{'docid': 'd1', 'score': 1.0}])
+        cache.put((SHARDED_INDEX, 'json', 'query', 10, 100, 'ArcticEmbedL'), b'[]')
+        cache.put(('msmarco-v1-passage', 'query', 10, None, None, None), [])
+
+        self.controller.update_settings(shard, ef_search='200')
+
+        self.assertEqual(self.controller.indexes[shard].ef_search, 200)
+        self.assertIsNone(cache.get((SHARDED_INDEX, 'query', 10, 100, 'ArcticEmbedL')))
+        self.assertIsNone(cache.get((SHARDED_INDEX, 'json', 'query', 10, 100, 'ArcticEmbedL')))
+        self.assertEqual(cache.get(('msmarco-v1-passage', 'query', 10, None, None, None)), [])
+
+    def test_cached_search_skips_searcher(self):
+        candidates = [{'docid': 'd1', 'score': 1.0, 'doc': {'contents': 'text'}}]
+        self.controller._result_cache.put(('msmarco-v1-passage', 'query', 10, None, None, None), candidates)
+
+        results = self.controller.search('query', 'msmarco-v1-passage', 10, qid='q1')
+
+        self.assertEqual(results['query'], {'qid': 'q1', 'text': 'query'})
+        self.assertIs(results['candidates'], candidates)
+        self.assertNotIn('msmarco-v1-passage', self.controller.indexes)
+
+    def test_search_bytes_takes_one_cache_slot(self):
+        hit = mock.Mock(docid='d1', score=1.5)
+        hit.lucene_document.get.return_value = '{"id": "d1", "contents": "text"}'
+        searcher = mock.Mock()
+        searcher.search.return_value = [hit]
+        self.controller.indexes['msmarco-v1-passage'] = IndexConfig(name='msmarco-v1-passage', searcher=searcher)
+
+        body = self.controller.search_bytes('query', 'msmarco-v1-passage', 10, qid='q1')
+
+        self.assertEqual(json.loads(body), {
+            'query': {'qid': 'q1', 'text': 'query'},
+            'candidates': [{'docid': 'd1', 'score': 1.5, 'doc': {'contents': 'text'}}],
+        })
+        self.assertEqual(len(self.controller._result_cache._entries), 1)
+        self.assertEqual(self.controller.search_bytes('query', 'msmarco-v1-passage', 10, qid='q1'), body)
+        searcher.search.assert_called_once_with('query', 10)
+
+    def test_search_dense_hits_without_raw(self):
+        stored = mock.Mock(docid='d1', score=2.0)
+        stored.lucene_document.get.return_value = '{"id": "d1", "contents": "text"}'
+        no_raw = mock.Mock(docid='d2', score=1.5)
+        no_raw.lucene_document.get.return_value = None
+        no_document = mock.Mock(docid='d3', score=1.0, lucene_document=None)
+        searcher = mock.Mock()
+        searcher.search.return_value = [stored, no_raw, no_document]
+        self.controller.indexes['corpus.model.hnsw'] = IndexConfig(name='corpus.model.hnsw', searcher=searcher)
+
+        results = self.controller.search('query', 'corpus.model.hnsw', 10)
+
+        self.assertEqual(results['candidates'], [
+            {'docid': 'd1', 'score': 2.0, 'doc': {'contents': 'text'}},
+            {'docid': 'd2', 'score': 1.5},
+            {'docid': 'd3', 'score': 1.0},
+        ])
+
+    def test_sharded_search_breaks_ties_in_shard_order(self):
+        def search_single_shard(shard_name, query, k, ef_search, encoder):
+            return np.array([1.0], dtype=np.float32), [shard_name]
+
+        with mock.patch.object(self.controller, '_search_single_shard', side_effect=search_single_shard):
+            results = self.controller._sharded_search('query', 3, 100, 'ArcticEmbedL')
+        self.assertEqual([result['docid'] for result in results], list(SHARDS[:3]))
+
+    def test_get_document_rejects_dense_index(self):
+        shard = SHARDS[0]
+        with mock.patch.object(self.controller, 'add_index') as add_index:
+            with self.assertRaises(ValueError):
+                self.controller.get_document('doc1', shard)
+            add_index.assert_not_called()
+
+
+class TestSearchControllerQuantization(unittest.TestCase):
+    HNSW_INFO = {
+        'corpus.model.hnsw': {'size compressed (bytes)': 200},
+        'corpus.model.hnsw-int8': {'size compressed (bytes)': 100},
+        'other.model.hnsw': {'size compressed (bytes)': 300},
+    }
+
+    def setUp(self):
+        patches = [
+            mock.patch.dict('pyserini.server.search_controller.LUCENE_HNSW_INDEX_INFO', self.HNSW_INFO),
+            # Every load gets its own searcher, so that reloads can be told apart.
+            mock.patch('pyserini.server.search_controller.LuceneHnswDenseSearcher', **{
+                'from_prebuilt_index.side_effect': lambda *args, **kwargs: mock.Mock(**{'search.return_value': []}),
+            }),
+            mock.patch('pyserini.server.search_controller.check_downloaded', side_effect=lambda name: name),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.controller = SearchController()
+        self.addCleanup(lambda: [batcher.close() for batcher in self.controller._batchers.values()])
+
+    def test_int8_variant_by_default(self):
+        config = self.controller.add_index(IndexConfig(name='corpus.model.hnsw'))
+        self.assertEqual(config.prebuilt_index, 'corpus.model.hnsw-int8')
+        self.assertEqual(self.controller.get_settings('corpus.model.hnsw')['quantization'], 'int8')
+        status = self.controller.get_status('corpus.model.hnsw')
+        self.assertEqual(status['downloaded'], 'corpus.model.hnsw-int8')
+        self.assertEqual(status['size compressed (bytes)'], 100)
+
+    def test_fp32_without_int8_variant(self):
+        config = self.controller.add_index(IndexConfig(name='other.model.hnsw'))
+        self.assertEqual(config.prebuilt_index, 'other.model.hnsw')
+        self.assertEqual(self.controller.get_settings('other.model.hnsw')['quantization'], 'fp32')
+
+    def test_status_before_loading(self):
+        self.assertEqual(self.controller.get_status('corpus.model.hnsw')['downloaded'], 'corpus.model.hnsw-int8')
+
+    def test_update_quantization_reloads(self):
+        self.controller.add_index(IndexConfig(name='corpus.model.hnsw'))
+        self.controller.update_settings('corpus.model.hnsw', quantization='fp32')
+        config = self.controller.indexes['corpus.model.hnsw']
+        self.assertEqual(config.prebuilt_index, 'corpus.model.hnsw')
+        self.assertEqual(self.controller.get_settings('corpus.model.hnsw')['quantization'], 'fp32')
+        with self.assertRaises(ValueError):
+            self.controller.update_settings('corpus.model.hnsw', quantization='fp8')
+
+    def test_rejected_update_changes_nothing(self):
+        self.controller.add_index(IndexConfig(name='corpus.model.hnsw'))
+        with self.assertRaises(ValueError):
+            self.controller.update_settings('corpus.model.hnsw', ef_search='200', encoder='Other', quantization='fp8')
+        config = self.controller.indexes['corpus.model.hnsw']
+        self.assertEqual(config.ef_search, 100)
+        self.assertIsNone(config.encoder)
+        self.assertEqual(config.quantization, 'int8')
+
+    def test_reload_closes_previous_searcher(self):
+        previous = self.controller.add_index(IndexConfig(name='corpus.model.hnsw')).searcher
+        self.controller.update_settings('corpus.model.hnsw', quantization='fp32')
+        config = self.controller.indexes['corpus.model.hnsw']
+        self.assertIsNot(config.searcher, previous)
+        previous.close.assert_called_once_with()
+        config.searcher.close.assert_not_called()
+
+    def test_search_retries_after_reload(self):
+        config = self.controller.add_index(IndexConfig(name='corpus.model.hnsw'))
+        config.searcher.search.return_value = ['hit']
+        replaced = mock.Mock()
+
+        def reload(query, k):
+            # The searcher is swapped between looking up the batcher and searching through it.
+            self.controller._batchers['corpus.model.hnsw'] = QueryBatcher(config.searcher)
+            raise QueryBatcherClosed()
+
+        replaced.search.side_effect = reload
+        self.controller._batchers['corpus.model.hnsw'].close()
+        self.controller._batchers['corpus.model.hnsw'] = replaced
+        self.assertEqual(self.controller._search_hits(config, 'query', 10), ['hit'])
+
+    def test_search_ignores_unloaded_quantization(self):
+        # Quantization is only switched through update_settings(), never by a search.
+        self.controller.add_index(IndexConfig(name='corpus.model.hnsw'))
+        self.controller._search_candidates('query', 'corpus.model.hnsw', 10, None, None, None)
+        self.assertEqual(self.controller.indexes['corpus.model.hnsw'].prebuilt_index, 'corpus.model.hnsw-int8')
+
+
+class FakeDenseSearcher:
+    """Stand-in for LuceneHnswDenseSearcher; the query 'slow' blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.search_threads = []
+        self.batches = []
+        self.error = None
+
+    def search(self, q, k):
+        self.search_threads.append(threading.current_thread())
+        if q == 'slow':
+            self.release.wait(5)
+        return [f'{q}-{i}' for i in range(k)]
+
+    def batch_search(self, queries, qids, k, threads):
+        self.batches.append((list(queries), k, threads))
+        if self.error:
+            raise self.error
+        return {qid: [f'{q}-{i}' for i in range(k)] for q, qid in zip(queries, qids)}
+
+
+class TestQueryBatcher(unittest.TestCase):
+    def setUp(self):
+        self.searcher = FakeDenseSearcher()
+        self.executor = ThreadPoolExecutor(max_workers=8)
+        self.addCleanup(self.executor.shutdown)
+
+    def make_batcher(self, **kwargs):
+        batcher = QueryBatcher(self.searcher, **kwargs)
+        self.addCleanup(batcher.close)
+        # Never leave the slow query blocked, even when an assertion fails.
+        self.addCleanup(self.searcher.release.set)
+        return batcher
+
+    def start_slow_query(self, batcher):
+        future = self.executor.submit(batcher.search, 'slow', 1)
+        while not self.searcher.search_threads:
+            time.sleep(0.001)
+        return future
+
+    def test_lone_query_runs_immediately(self):
+        batcher = self.make_batcher(window=60.0)
+        self.assertEqual(batcher.search('q', 2), ['q-0', 'q-1'])
+        self.assertEqual(self.searcher.search_threads, [threading.current_thread()])
+        self.assertEqual(self.searcher.batches, [])
+
+    def test_size_triggered_flush(self):
+        batcher = self.make_batcher(threads=2, window=60.0, max_batch_size=3)
+        slow = self.start_slow_query(batcher)
+        futures = [self.executor.submit(batcher.search, f'q{i}', i + 1) for i in range(3)]
+
+        # The batch is full, so it runs without waiting for the window or the slow query.
+        results = [future.result(timeout=5) for future in futures]
+        self.assertFalse(slow.done())
+        self.assertEqual(len(self.searcher.batches), 1)
+        queries, k, threads = self.searcher.batches[0]
+        self.assertEqual(sorted(queries), ['q0', 'q1', 'q2'])
+        self.assertEqual((k, threads), (3, 2))
+        # Each caller gets its own hits, truncated to the k it asked for.
+        self.assertEqual(results, [['q0-0'], ['q1-0', 'q1-1'], ['q2-0', 'q2-1', 'q2-2']])
+
+        self.searcher.release.set()
+        self.assertEqual(slow.result(timeout=5), ['slow-0'])
+
+    def test_timer_triggered_flush(self):
+        batcher = self.make_batcher(window=0.05, max_batch_size=64)
+        slow = self.start_slow_query(batcher)
+        futures = [self.executor.submit(batcher.search, f'q{i}', 1) for i in range(2)]
+        while len(batcher._pending) < 2:
+            time.sleep(0.001)
+
+        # The batch is not full and the slow query is still running, so only the window flushes it.
+        self.assertEqual([future.result(timeout=5) for future in futures], [['q0-0'], ['q1-0']])
+        self.assertFalse(slow.done())
+        self.assertEqual(len(self.searcher.batches), 1)
+
+    def test_exception_reaches_every_caller(self):
+        self.searcher.error = RuntimeError('search failed')
+        batcher = self.make_batcher(window=60.0, max_batch_size=3)
+        self.start_slow_query(batcher)
+        futures = [self.executor.submit(batcher.search, f'q{i}', 1) for i in range(3)]
+        for future in futures:
+            with self.assertRaisesRegex(RuntimeError, 'search failed'):
+                future.result(timeout=5)
+
+    def test_single_flusher_thread(self):
+        threads_before = threading.active_count()
+        batcher = self.make_batcher(window=0.001)
+        for i in range(50):
+            batcher.search(f'q{i}', 1)
+        self.assertEqual(threading.active_count(), threads_before + 1)
+
+    def test_close_waits_for_in_flight_search(self):
+        batcher = self.make_batcher()
+        slow = self.start_slow_query(batcher)
+        closing = self.executor.submit(batcher.close)
+        while not batcher._closed:
+            time.sleep(0.001)
+
+        # The closed batcher turns new callers away but keeps its searcher until the running query finishes.
+        with self.assertRaises(QueryBatcherClosed):
+            batcher.search('q', 1)
+        self.assertFalse(closing.done())
+        self.searcher.release.set()
+        self.assertEqual(slow.result(timeout=5), ['slow-0'])
+        closing.result(timeout=5)
+
+    def test_close_detaches_flusher(self):
+        with mock.patch('pyserini.server.search_controller.detach') as detach:
+            batcher = QueryBatcher(self.searcher)
+            batcher.close()
+        detach.assert_called_once_with()
+        self.assertFalse(batcher._flusher.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()